@@ -40,6 +40,8 @@ ALLOW_CONNECT_LOCALHOST = settings.get('ALLOW_CONNECT_LOCALHOST', True)
 ALLOW_CONNECT_PRIVATE = settings.get('ALLOW_CONNECT_PRIVATE', True)
 # allow mist.io to connect to KVM hypervisor running on the same server
 ALLOW_LIBVIRT_LOCALHOST = settings.get('ALLOW_LIBVIRT_LOCALHOST', False)
+# seconds for which an authenticated libcloud driver is reused
+CONN_CACHE_TTL = settings.get('CONN_CACHE_TTL', 600)
 
 # celery settings
 CELERY_SETTINGS = {
@@ -73,7 +75,7 @@ STATES = {
 
 
 # All EC2 providers, useful for type checking
-EC2_PROVIDERS = (
+EC2_PROVIDERS = frozenset([
     Provider.EC2_US_EAST,
     Provider.EC2_AP_NORTHEAST,
     Provider.EC2_AP_NORTHEAST1,
@@ -85,7 +87,7 @@ EC2_PROVIDERS = (
     Provider.EC2_AP_SOUTHEAST2,
     Provider.EC2_SA_EAST,
     Provider.EC2_US_WEST_OREGON
-)
+])
 
 
 EC2_SECURITYGROUP = {
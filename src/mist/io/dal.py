@@ -26,8 +26,16 @@ getOODictField, getFieldsListField, getFieldsDictField, OODict, UserEngine
 
 import os
 import yaml
+import threading
 from time import time, sleep
 
+# Use the libyaml C bindings when available, falling back to the pure python
+# implementation otherwise.
+try:
+    from yaml import CLoader as YamlLoader, CDumper as YamlDumper
+except ImportError:
+    from yaml import Loader as YamlLoader, Dumper as YamlDumper
+
 import abc
 from copy import copy, deepcopy
 from collections import MutableSequence, MutableMapping
@@ -505,6 +513,43 @@ class FieldsDict(FieldsSequence, MutableMapping):
 # Completely untested, just POC. Shoud be easy though to make it work
 
 
+# Parsed yaml files keyed by path, along with the (inode, mtime, size)
+# signature of the file at the time it was parsed.
+_yaml_cache = {}
+_yaml_cache_lock = threading.Lock()
+
+
+class folded_unicode(unicode): pass
+class literal_unicode(unicode): pass
+class literal_string(str): pass
+
+
+def literal_unicode_representer(dumper, data):
+    return dumper.represent_scalar(u'tag:yaml.org,2002:str',
+                                   data, style='|')
+
+
+def literal_string_representer(dumper, data):
+    return dumper.represent_scalar(u'tag:yaml.org,2002:str',
+                                   data, style='|')
+
+
+def folded_unicode_representer(dumper, data):
+    return dumper.represent_scalar(u'tag:yaml.org,2002:str',
+                                   data, style='>')
+
+
+def unicode_representer(dumper, uni):
+    return yaml.ScalarNode(tag=u'tag:yaml.org,2002:str', value=uni)
+
+
+yaml.add_representer(unicode, unicode_representer, Dumper=YamlDumper)
+yaml.add_representer(literal_unicode, literal_unicode_representer,
+                     Dumper=YamlDumper)
+yaml.add_representer(literal_string, literal_string_representer,
+                     Dumper=YamlDumper)
+
+
 class OODictYaml(OODict):
     """This takes care of all storage related operations."""
 
@@ -515,58 +560,55 @@ class OODictYaml(OODict):
         self._yaml_rel_path = yaml_rel_path
         super(OODictYaml, self).__init__(_dict=self._yaml_read())
 
-    def _yaml_read(self):
+    def _yaml_read(self, use_cache=True):
         """Load user settings from db.yaml We have seperated
         user-specific settings from general settings
         and everything regarding the user dict is
         now in db.yaml (as if it were a database). General
-        settings like js_build etc remain in settings.yaml file"""
+        settings like js_build etc remain in settings.yaml file
+
+        If use_cache is False, the file is always parsed again. Reads that
+        precede a save must do this, since a stale cache hit would make the
+        save overwrite changes made by other processes.
+        """
         yaml_db = os.getcwd() + "/" + self._yaml_rel_path
-        try:
-            config_file = open(yaml_db, 'r')
-        except IOError as exc:
-            # maybe file doesn't exist, try to create it
+        if not os.path.exists(yaml_db):
+            # file doesn't exist, create it empty
             log.error("%s doesn't exist.", yaml_db)
-            config_file = open(yaml_db, 'w')
-            config_file.close()
-        with open(yaml_db, 'r') as config_file:
-            try:
-                user_dict = yaml.load(config_file) or {}
-            except:
-                log.error('Error parsing db.yaml.')
-                raise
-        return user_dict
+            open(yaml_db, 'w').close()
+            return {}
+        # skip parsing if the file hasn't changed since we last read it,
+        # callers get their own copy since they modify it in place
+        stat = os.stat(yaml_db)
+        signature = (stat.st_ino, stat.st_mtime, stat.st_size)
+        with _yaml_cache_lock:
+            cached = _yaml_cache.get(yaml_db)
+        if use_cache and cached and cached[0] == signature:
+            return deepcopy(cached[1])
+        with open(yaml_db, 'rb') as config_file:
+            data = config_file.read()
+        try:
+            user_dict = yaml.load(data, Loader=YamlLoader) or {}
+        except yaml.YAMLError:
+            log.error('Error parsing db.yaml.')
+            raise
+        with _yaml_cache_lock:
+            _yaml_cache[yaml_db] = (signature, user_dict)
+        return deepcopy(user_dict)
 
     def save(self):
         """Save data to yaml file."""
-        class folded_unicode(unicode): pass
-        class literal_unicode(unicode): pass
-        class literal_string(str): pass
-
-        def literal_unicode_representer(dumper, data):
-            return dumper.represent_scalar(u'tag:yaml.org,2002:str',
-                                           data, style='|')
-
-        def literal_string_representer(dumper, data):
-            return dumper.represent_scalar(u'tag:yaml.org,2002:str',
-                                           data, style='|')
-
-        def folded_unicode_representer(dumper, data):
-            return dumper.represent_scalar(u'tag:yaml.org,2002:str',
-                                           data, style='>')
-
-        def unicode_representer(dumper, uni):
-            return yaml.ScalarNode(tag=u'tag:yaml.org,2002:str', value=uni)
-
-        yaml.add_representer(unicode, unicode_representer)
-        yaml.add_representer(literal_unicode, literal_unicode_representer)
-        yaml.add_representer(literal_string, literal_string_representer)
         yaml_db = os.getcwd() + '/' + self._yaml_rel_path
+        # dump to a string first so that the file is written in one go
+        data = yaml.dump(self._dict, Dumper=YamlDumper,
+                         default_flow_style=False)
         with open(yaml_db, 'w') as config_file:
-            yaml.dump(self._dict, config_file, default_flow_style=False)
+            config_file.write(data)
 
     def refresh(self):
-        super(OODictYaml, self).__init__(_dict=self._yaml_read())
+        # refresh is what lock_n_load uses before edits, always hit the disk
+        user_dict = self._yaml_read(use_cache=False)
+        super(OODictYaml, self).__init__(_dict=user_dict)
 
 
 class OODictYamlLock(OODictYaml):
@@ -13,11 +13,6 @@ import functools
 from hashlib import sha1
 from contextlib import contextmanager
 
-import netaddr
-from amqp import Message
-from amqp.connection import Connection
-from amqp.exceptions import NotFound as AmqpNotFound
-
 from mist.io.model import User
 from mist.io.exceptions import MistError
 
@@ -46,9 +41,10 @@ def get_temp_file(content):
 
     """
     (tmp_fd, tmp_path) = tempfile.mkstemp()
-    f = os.fdopen(tmp_fd, 'w+b')
-    f.write(content)
-    f.close()
+    try:
+        os.write(tmp_fd, content)
+    finally:
+        os.close(tmp_fd)
     try:
         yield tmp_path
     finally:
@@ -65,11 +61,12 @@ def params_from_request(request):
     the dict.
 
     """
-    try:
-        params = request.json_body
-    except:
-        params = request.params
-    return params
+    if request.body:
+        try:
+            return request.json_body
+        except ValueError:
+            pass
+    return request.params
 
 
 def user_from_request(request):
@@ -152,6 +149,8 @@ def parse_ping(stdout):
 
 def amqp_publish(exchange, routing_key, data,
                  ex_type='fanout', ex_declare=False):
+    from amqp import Message
+    from amqp.connection import Connection
     connection = Connection(config.AMQP_URI)
     channel = connection.channel()
     if ex_declare:
@@ -164,6 +163,8 @@ def amqp_publish(exchange, routing_key, data,
 
 def amqp_subscribe(exchange, callback, queue='',
                    ex_type='fanout', routing_keys=None):
+    from amqp.connection import Connection
+
     def json_parse_dec(func):
         @functools.wraps(func)
         def wrapped(msg):
@@ -208,6 +209,7 @@ def _amqp_user_exchange(user):
 
 
 def amqp_publish_user(user, routing_key, data):
+    from amqp.exceptions import NotFound as AmqpNotFound
     try:
         amqp_publish(_amqp_user_exchange(user), routing_key, data)
     except AmqpNotFound:
@@ -222,6 +224,8 @@ def amqp_subscribe_user(user, queue, callback):
 
 
 def amqp_user_listening(user):
+    from amqp.connection import Connection
+    from amqp.exceptions import NotFound as AmqpNotFound
     connection = Connection(config.AMQP_URI)
     channel = connection.channel()
     try:
@@ -322,6 +326,7 @@ def sanitize_host(host):
 def check_host(host, allow_localhost=config.ALLOW_CONNECT_LOCALHOST,
                allow_private=config.ALLOW_CONNECT_PRIVATE):
     """Check if a given host is a valid DNS name or IPv4 address"""
+    import netaddr
 
     try:
         ipaddr = socket.gethostbyname(host)
@@ -8,6 +8,7 @@ import base64
 import requests
 import subprocess
 import re
+import threading
 from time import sleep, time
 from datetime import datetime
 from hashlib import sha256
@@ -61,6 +62,12 @@ import libcloud.security
 libcloud.security.CA_CERTS_PATH.append('cacert.pem')
 libcloud.security.CA_CERTS_PATH.append('./src/mist.io/cacert.pem')
 
+# invariant for the lifetime of the process, so set it once here instead of
+# on every libvirt connection
+import libcloud.compute.drivers.libvirt_driver
+libcloud.compute.drivers.libvirt_driver.ALLOW_LIBVIRT_LOCALHOST = \
+    config.ALLOW_LIBVIRT_LOCALHOST
+
 import logging
 logging.basicConfig(level=config.PY_LOG_LEVEL,
                     format=config.PY_LOG_FORMAT,
@@ -1201,6 +1208,29 @@ def disassociate_key(user, key_id, cloud_id, machine_id, host=None):
     trigger_session_update(user.email, ['keys'])
 
 
+# Cloud fields that identify a driver instance in the connection cache.
+_CONN_CACHE_FIELDS = ('provider', 'apikey', 'apisecret', 'apiurl',
+                      'tenant_name', 'region', 'auth_version',
+                      'compute_endpoint')
+# Drivers that must not be shared between calls. Bare metal and coreos wrap
+# the cloud's saved machines, libvirt connections get closed after use and
+# docker/vcloud toggle libcloud.security globals while connecting.
+_CONN_CACHE_SKIP = ('bare_metal', 'coreos', Provider.LIBVIRT, Provider.DOCKER,
+                    Provider.VCLOUD, Provider.INDONESIAN_VCLOUD)
+# libcloud connections aren't thread safe, so every thread keeps its own
+# cache of drivers.
+_conn_cache = threading.local()
+_driver_classes = {}
+
+
+def _get_driver(provider):
+    """Return libcloud's driver class for provider, memoized."""
+    driver = _driver_classes.get(provider)
+    if driver is None:
+        driver = _driver_classes[provider] = get_driver(provider)
+    return driver
+
+
 def connect_provider(cloud):
     """Establishes cloud connection using the credentials specified.
 
@@ -1213,14 +1243,43 @@ def connect_provider(cloud):
 
     Cloud is expected to be a mist.io.model.Cloud
 
+    Driver instances are cached per thread for config.CONN_CACHE_TTL
+    seconds, keyed by the cloud's credentials, so that consecutive calls for
+    the same cloud reuse the already authenticated connection instead of
+    starting over.
+
     """
+    provider = cloud.provider
+    if provider in _CONN_CACHE_SKIP:
+        return _connect_provider(cloud)
+
+    raw = cloud.get_raw()
+    key = tuple(raw.get(field) for field in _CONN_CACHE_FIELDS)
+    now = time()
+    conns = getattr(_conn_cache, 'conns', None)
+    if conns is None:
+        conns = _conn_cache.conns = {}
+    cached = conns.get(key)
+    if cached and now - cached[1] < config.CONN_CACHE_TTL:
+        return cached[0]
+
+    conn = _connect_provider(cloud)
+    for stale_key in [k for k, (_, created) in conns.iteritems()
+                      if now - created >= config.CONN_CACHE_TTL]:
+        del conns[stale_key]
+    conns[key] = (conn, now)
+    return conn
+
+
+def _connect_provider(cloud):
+    """Instantiate a new libcloud driver for cloud, bypassing the cache."""
     import libcloud.security
-    if cloud.provider == Provider.LIBVIRT:
-        import libcloud.compute.drivers.libvirt_driver
-        libcloud.compute.drivers.libvirt_driver.ALLOW_LIBVIRT_LOCALHOST = config.ALLOW_LIBVIRT_LOCALHOST
-    if cloud.provider not in ['bare_metal', 'coreos']:
-        driver = get_driver(cloud.provider)
-    if cloud.provider == Provider.AZURE:
+    # every field access on cloud goes through OODict casting, so read the
+    # provider only once
+    provider = cloud.provider
+    if provider not in ['bare_metal', 'coreos']:
+        driver = _get_driver(provider)
+    if provider == Provider.AZURE:
         # create a temp file and output the cert there, so that
         # Azure driver is instantiated by providing a string with the key instead of
         # a cert file
@@ -1228,7 +1287,7 @@ def connect_provider(cloud):
         temp_key_file.write(cloud.apisecret)
         temp_key_file.close()
         conn = driver(cloud.apikey, temp_key_file.name)
-    elif cloud.provider == Provider.OPENSTACK:
+    elif provider == Provider.OPENSTACK:
         conn = driver(
             cloud.apikey,
             cloud.apisecret,
@@ -1238,16 +1297,16 @@ def connect_provider(cloud):
             ex_force_service_region=cloud.region,
             ex_force_base_url=cloud.compute_endpoint,
         )
-    elif cloud.provider in [Provider.LINODE, Provider.HOSTVIRTUAL, Provider.VULTR]:
+    elif provider in [Provider.LINODE, Provider.HOSTVIRTUAL, Provider.VULTR]:
         conn = driver(cloud.apisecret)
-    elif cloud.provider == Provider.PACKET:
+    elif provider == Provider.PACKET:
         if cloud.tenant_name:
             conn = driver(cloud.apisecret, project=cloud.tenant_name)
         else:
             conn = driver(cloud.apisecret)
-    elif cloud.provider == Provider.GCE:
+    elif provider == Provider.GCE:
         conn = driver(cloud.apikey, cloud.apisecret, project=cloud.tenant_name)
-    elif cloud.provider == Provider.DOCKER:
+    elif provider == Provider.DOCKER:
         libcloud.security.VERIFY_SSL_CERT = False;
         if cloud.key_file and cloud.cert_file:
             # tls auth, needs to pass the key and cert as files
@@ -1267,28 +1326,28 @@ def connect_provider(cloud):
             conn = driver(host=cloud.apiurl, port=cloud.docker_port, key_file=key_temp_file.name, cert_file=cert_temp_file.name)
         else:
             conn = driver(cloud.apikey, cloud.apisecret, cloud.apiurl, cloud.docker_port)
-    elif cloud.provider in [Provider.RACKSPACE_FIRST_GEN,
-                              Provider.RACKSPACE]:
+    elif provider in [Provider.RACKSPACE_FIRST_GEN,
+                      Provider.RACKSPACE]:
         conn = driver(cloud.apikey, cloud.apisecret,
                       region=cloud.region)
-    elif cloud.provider in [Provider.NEPHOSCALE, Provider.SOFTLAYER]:
+    elif provider in [Provider.NEPHOSCALE, Provider.SOFTLAYER]:
         conn = driver(cloud.apikey, cloud.apisecret)
-    elif cloud.provider in [Provider.VCLOUD, Provider.INDONESIAN_VCLOUD]:
+    elif provider in [Provider.VCLOUD, Provider.INDONESIAN_VCLOUD]:
         libcloud.security.VERIFY_SSL_CERT = False;
         conn = driver(cloud.apikey, cloud.apisecret, host=cloud.apiurl)
-    elif cloud.provider == Provider.DIGITAL_OCEAN:
+    elif provider == Provider.DIGITAL_OCEAN:
         if cloud.apikey == cloud.apisecret:  # API v2
             conn = driver(cloud.apisecret)
         else:   # API v1
-            driver = get_driver('digitalocean_first_gen')
+            driver = _get_driver('digitalocean_first_gen')
             conn = driver(cloud.apikey, cloud.apisecret)
-    elif cloud.provider == Provider.VSPHERE:
+    elif provider == Provider.VSPHERE:
         conn = driver(host=cloud.apiurl, username=cloud.apikey, password=cloud.apisecret)
-    elif cloud.provider == 'bare_metal':
+    elif provider == 'bare_metal':
         conn = BareMetalDriver(cloud.machines)
-    elif cloud.provider == 'coreos':
+    elif provider == 'coreos':
         conn = CoreOSDriver(cloud.machines)
-    elif cloud.provider == Provider.LIBVIRT:
+    elif provider == Provider.LIBVIRT:
         # support the three ways to connect: local system, qemu+tcp, qemu+ssh
         if cloud.apisecret:
            conn = driver(cloud.apiurl, user=cloud.apikey, ssh_key=cloud.apisecret, ssh_port=cloud.ssh_port)
@@ -1298,10 +1357,58 @@ def connect_provider(cloud):
         # ec2
         conn = driver(cloud.apikey, cloud.apisecret)
         # Account for sub-provider regions (EC2_US_WEST, EC2_US_EAST etc.)
-        conn.type = cloud.provider
+        conn.type = provider
     return conn
 
 
+# Providers mist.io can't set tags on. Tags are allowed for all providers
+# on mist.core.
+_NO_TAG_PROVIDERS = frozenset([
+    Provider.RACKSPACE_FIRST_GEN, Provider.LINODE, Provider.NEPHOSCALE,
+    Provider.SOFTLAYER, Provider.DIGITAL_OCEAN, Provider.DOCKER,
+    Provider.AZURE, Provider.VCLOUD, Provider.INDONESIAN_VCLOUD,
+    Provider.LIBVIRT, Provider.HOSTVIRTUAL, Provider.VSPHERE, Provider.VULTR,
+    Provider.PACKET, 'bare_metal', 'coreos'
+])
+_RENAME_PROVIDERS = frozenset([
+    Provider.LINODE, Provider.NEPHOSCALE, Provider.DIGITAL_OCEAN,
+    Provider.OPENSTACK, Provider.RACKSPACE
+]) | config.EC2_PROVIDERS
+_provider_caps = {}
+
+# (can_start, can_stop, can_destroy, can_reboot) per machine state, before
+# any provider specific adjustments. Other states get the running defaults.
+_STATE_ACTIONS = {
+    NodeState.REBOOTING: (False, False, True, False),
+    NodeState.PENDING: (False, False, True, False),
+    # we assume unknown state means stopped
+    NodeState.UNKNOWN: (True, False, True, False),
+    NodeState.STOPPED: (True, False, True, False),
+    NodeState.TERMINATED: (False, False, False, False),
+}
+_RUNNING_ACTIONS = (False, True, True, True)
+
+
+def _get_provider_caps(provider):
+    """Return a (can_tag, can_rename) tuple for provider.
+
+    These only depend on the provider, so they're computed once per provider
+    instead of once per listed machine.
+
+    """
+    caps = _provider_caps.get(provider)
+    if caps is None:
+        try:
+            from mist.core.views import set_machine_tags
+        except ImportError:
+            can_tag = provider not in _NO_TAG_PROVIDERS
+        else:
+            can_tag = True
+        caps = _provider_caps[provider] = (can_tag,
+                                           provider in _RENAME_PROVIDERS)
+    return caps
+
+
 def get_machine_actions(machine_from_api, conn, extra):
     """Returns available machine actions based on cloud type.
 
@@ -1313,43 +1420,16 @@ def get_machine_actions(machine_from_api, conn, extra):
 
     """
 
-    # defaults for running state
-    can_start = False
-    can_stop = True
-    can_destroy = True
-    can_reboot = True
-    can_tag = True
+    # tag allowed on mist.core only for all providers, mist.io
+    # supports only EC2, RackSpace, GCE, OpenStack
+    can_tag, can_rename = _get_provider_caps(conn.type)
+
+    can_start, can_stop, can_destroy, can_reboot = _STATE_ACTIONS.get(
+        machine_from_api.state, _RUNNING_ACTIONS)
+    # resume, suspend and undefine are states related to KVM
     can_undefine = False
     can_resume = False
     can_suspend = False
-    # resume, suspend and undefine are states related to KVM
-
-    # tag allowed on mist.core only for all providers, mist.io
-    # supports only EC2, RackSpace, GCE, OpenStack
-    try:
-        from mist.core.views import set_machine_tags
-    except ImportError:
-        if conn.type in (Provider.RACKSPACE_FIRST_GEN, Provider.LINODE,
-                         Provider.NEPHOSCALE, Provider.SOFTLAYER,
-                         Provider.DIGITAL_OCEAN, Provider.DOCKER, Provider.AZURE,
-                         Provider.VCLOUD, Provider.INDONESIAN_VCLOUD, Provider.LIBVIRT, Provider.HOSTVIRTUAL, Provider.VSPHERE, Provider.VULTR, Provider.PACKET, 'bare_metal', 'coreos'):
-            can_tag = False
-
-    # for other states
-    if machine_from_api.state in (NodeState.REBOOTING, NodeState.PENDING):
-        can_start = False
-        can_stop = False
-        can_reboot = False
-    elif machine_from_api.state in (NodeState.UNKNOWN, NodeState.STOPPED):
-        # We assume unknown state mean stopped
-        can_stop = False
-        can_start = True
-        can_reboot = False
-    elif machine_from_api.state in (NodeState.TERMINATED,):
-        can_start = False
-        can_destroy = False
-        can_stop = False
-        can_reboot = False
 
     if conn.type in ['bare_metal', 'coreos']:
         can_start = False
@@ -1390,12 +1470,6 @@ def get_machine_actions(machine_from_api, conn, extra):
         can_suspend = False
         can_resume = False
 
-    if conn.type in (Provider.LINODE, Provider.NEPHOSCALE, Provider.DIGITAL_OCEAN,
-                     Provider.OPENSTACK, Provider.RACKSPACE) or conn.type in config.EC2_PROVIDERS:
-        can_rename = True
-    else:
-        can_rename = False
-
 
     return {'can_stop': can_stop,
             'can_start': can_start,
@@ -1867,17 +1941,17 @@ def _create_machine_ec2(conn, key_name, private_key, public_key,
     """
 
     # import key. This is supported only for EC2 at the moment.
-    with get_temp_file(public_key) as tmp_key_path:
-        try:
-            log.info("Attempting to import key (ec2-only)")
-            conn.ex_import_keypair(name=key_name, keyfile=tmp_key_path)
-        except Exception as exc:
-            if 'Duplicate' in exc.message:
-                log.debug('Key already exists, not importing anything.')
-            else:
-                log.error('Failed to import key.')
-                raise CloudUnavailableError("Failed to import key "
-                                              "(ec2-only): %r" % exc, exc=exc)
+    try:
+        log.info("Attempting to import key (ec2-only)")
+        conn.ex_import_keypair_from_string(name=key_name,
+                                           key_material=public_key)
+    except Exception as exc:
+        if 'Duplicate' in (getattr(exc, 'message', '') or repr(exc)):
+            log.debug('Key already exists, not importing anything.')
+        else:
+            log.error('Failed to import key.')
+            raise CloudUnavailableError("Failed to import key "
+                                          "(ec2-only): %r" % exc, exc=exc)
 
     # create security group
     name = config.EC2_SECURITYGROUP.get('name', '')
@@ -1887,7 +1961,7 @@ def _create_machine_ec2(conn, key_name, private_key, public_key,
         conn.ex_create_security_group(name=name, description=description)
         conn.ex_authorize_security_group_permissive(name=name)
     except Exception as exc:
-        if 'Duplicate' in exc.message:
+        if 'Duplicate' in (getattr(exc, 'message', '') or repr(exc)):
             log.info('Security group already exists, not doing anything.')
         else:
             raise InternalServerError("Couldn't create security group", exc)
@@ -3364,9 +3438,6 @@ def set_machine_tags(user, cloud_id, machine_id, tags):
 
     conn = connect_provider(cloud)
 
-    machine = Node(machine_id, name='', state=0, public_ips=[],
-                   private_ips=[], driver=conn)
-
     tags_dict = {}
     for tag in tags:
         for tag_key, tag_value in tag.items():
@@ -3376,6 +3447,22 @@ def set_machine_tags(user, cloud_id, machine_id, tags):
                 tag_value = tag_value.encode('utf-8')
             tags_dict[tag_key] = tag_value
 
+    if conn.type == 'gce':
+        # gce needs the real node, look it up instead of building one
+        machine = None
+        try:
+            for node in conn.list_nodes():
+                if node.id == machine_id:
+                    machine = node
+                    break
+        except Exception as exc:
+            raise CloudUnavailableError(cloud_id, exc)
+        if not machine:
+            raise MachineNotFoundError(machine_id)
+    else:
+        machine = Node(machine_id, name='', state=0, public_ips=[],
+                       private_ips=[], driver=conn)
+
     if conn.type in config.EC2_PROVIDERS:
         try:
             # first get a list of current tags. Make sure
@@ -3403,15 +3490,6 @@ def set_machine_tags(user, cloud_id, machine_id, tags):
             raise CloudUnavailableError(cloud_id, exc)
     else:
         if conn.type == 'gce':
-            try:
-                for node in conn.list_nodes():
-                    if node.id == machine_id:
-                        machine = node
-                        break
-            except Exception as exc:
-                raise CloudUnavailableError(cloud_id, exc)
-            if not machine:
-                raise MachineNotFoundError(machine_id)
             try:
                 conn.ex_set_node_metadata(machine, tags)
             except Exception as exc:
@@ -5,6 +5,7 @@ SSH.
 
 """
 
+import re
 from time import time, sleep
 from StringIO import StringIO
 
@@ -35,6 +36,12 @@ logging.basicConfig(level=config.PY_LOG_LEVEL,
 log = logging.getLogger(__name__)
 
 
+# Matches the username suggested in prompts like 'Please login as the user
+# "ubuntu" rather than the user "root".' or, on Amazon Linux, 'Please login
+# as the ec2-user user rather than root user.'
+LOGIN_HINT_RE = re.compile(r'Please login as the(?: user)?\s+"?([^"\s]+)"?')
+
+
 class ParamikoShell(object):
     """sHell
 
@@ -304,11 +311,9 @@ class ParamikoShell(object):
                 # the prompt.
                 retval, resp = self.command('uptime')
                 new_ssh_user = None
-                if 'Please login as the user ' in resp:
-                    new_ssh_user = resp.split()[5].strip('"')
-                elif 'Please login as the' in resp:
-                    # for EC2 Amazon Linux machines, usually with ec2-user
-                    new_ssh_user = resp.split()[4].strip('"')
+                match = LOGIN_HINT_RE.search(resp)
+                if match:
+                    new_ssh_user = match.group(1)
                 if new_ssh_user:
                     log.info("retrying as %s", new_ssh_user)
                     try: